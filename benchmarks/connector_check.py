@@ -0,0 +1,208 @@
+"""
+Vérification des étages placés devant le connecteur d'IA, avec des backends simulés.
+
+Scénarios vérifiés:
+- pré-filtre: image sans chat écartée sans appel à l'IA, image avec chat transmise
+- pré-filtre: erreur du modèle local, image transmise à l'IA plutôt que perdue
+- pré-filtre: seules les images retenues d'un passage sont envoyées, en un seul appel
+- cache: une image déjà vue sur le canal réutilise son verdict, pas sur un autre canal
+- pool: le backend de relève n'est lancé qu'après son délai, la requête perdante est annulée
+- pool: verdict de secours non sûr à la fin du budget de latence, jamais mis en cache
+- disjoncteur: un backend bloqué, annulé à chaque fin de budget, n'est plus appelé
+
+Aucun accès réseau ni modèle n'est nécessaire. Code de sortie 1 si une vérification échoue.
+
+Utilisation:
+    python benchmarks/connector_check.py
+"""
+import asyncio
+import io
+import logging
+import os
+import sys
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import detector_ha  # noqa: E402
+
+
+class FakeCatClassifier:
+    """Classifieur simulé: renvoie des scores prédéfinis, ou lève une erreur pour un score None"""
+
+    def __init__(self, scores=(1.0,)):
+        self.scores = list(scores)
+        self.calls = 0
+
+    def predict(self, image_data):
+        score = self.scores[min(self.calls, len(self.scores) - 1)]
+        self.calls += 1
+        if score is None:
+            raise RuntimeError("Erreur simulée du modèle")
+        return score
+
+
+def jpeg(color):
+    """Image JPEG unie de test"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class StubConnector(detector_ha.AIConnector):
+    """Backend d'IA simulé: verdict fixe après un délai, images reçues et annulations enregistrées"""
+
+    def __init__(self, name="stub", result=None, delay=0.0):
+        self.name = name
+        self.result = result or {"cat": True, "prey": False}
+        self.delay = delay
+        self.calls = []
+        self.cancelled = 0
+
+    async def _wait(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+    async def analyze_image_data(self, image_data):
+        self.calls.append([image_data])
+        await self._wait()
+        return dict(self.result)
+
+    async def analyze_frames(self, frames):
+        self.calls.append(list(frames))
+        await self._wait()
+        return detector_ha.merge_frame_results([dict(self.result) for _ in frames])
+
+
+async def check_prefilter_skip_and_pass():
+    backend = StubConnector()
+    connector = detector_ha.PreFilterConnector(backend, FakeCatClassifier([0.1, 0.9]), threshold=0.3)
+    skipped = await connector.analyze_image_data(b"vide")
+    assert skipped == {"cat": False, "prey": False, "prefiltered": True}, skipped
+    assert backend.calls == [], backend.calls
+    passed = await connector.analyze_image_data(b"chat")
+    assert passed["cat"] and not passed.get("prefiltered"), passed
+    assert backend.calls == [[b"chat"]], backend.calls
+    assert connector.stats == {"checked": 2, "passed": 1, "avoided": 1, "errors": 0}, connector.stats
+
+
+async def check_prefilter_error():
+    backend = StubConnector()
+    connector = detector_ha.PreFilterConnector(backend, FakeCatClassifier([None]), threshold=0.3)
+    result = await connector.analyze_image_data(b"image")
+    assert result["cat"], result
+    assert backend.calls == [[b"image"]], backend.calls
+    assert connector.stats["errors"] == 1, connector.stats
+
+
+async def check_prefilter_frames():
+    backend = StubConnector(result={"cat": True, "prey": True})
+    connector = detector_ha.PreFilterConnector(backend, FakeCatClassifier([0.9, 0.1, 0.8]), threshold=0.3)
+    result = await connector.analyze_frames([b"a", b"b", b"c"])
+    assert backend.calls == [[b"a", b"c"]], backend.calls
+    assert result["frames"][1] == {"cat": False, "prey": False, "prefiltered": True}, result["frames"]
+    assert result["cat"] and result["prey"] and result["best"] == 0, result
+
+
+async def analyze_on(connector, source, image_data):
+    """Analyse comme CatDetector.analyze_frames, pour le canal source"""
+    token = detector_ha.analysis_source.set(source)
+    try:
+        return await connector.analyze_image_data(image_data)
+    finally:
+        detector_ha.analysis_source.reset(token)
+
+
+async def check_cache_per_channel():
+    backend = StubConnector()
+    connector = detector_ha.CachedConnector(backend)
+    image = jpeg((20, 20, 20))
+    await analyze_on(connector, ("nvr", 0), image)
+    hit = await analyze_on(connector, ("nvr", 0), image)
+    assert hit.get("cached"), hit
+    other = await analyze_on(connector, ("nvr", 1), image)
+    assert not other.get("cached"), other
+    assert len(backend.calls) == 2, backend.calls
+
+
+async def check_hedge_delay():
+    fast = StubConnector("primary", delay=0.05)
+    spare = StubConnector("spare", delay=0.05)
+    pool = detector_ha.HedgedConnector([(fast, 0.0, True), (spare, 0.2, True)])
+    result = await pool.analyze_image_data(b"image")
+    assert result["backend"] == "primary", result
+    # Réponse avant le délai de relève: le second backend n'est jamais appelé
+    assert spare.calls == [], spare.calls
+
+
+async def check_hedge_cancels_loser():
+    slow = StubConnector("primary", delay=5.0)
+    spare = StubConnector("spare", result={"cat": True, "prey": True}, delay=0.05)
+    pool = detector_ha.HedgedConnector([(slow, 0.0, True), (spare, 0.1, True)])
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    result = await pool.analyze_image_data(b"image")
+    elapsed = loop.time() - started
+    assert result["backend"] == "spare" and result["prey"], result
+    assert 0.1 <= elapsed < 1.0, elapsed
+    assert len(spare.calls) == 1 and slow.cancelled == 1, (spare.calls, slow.cancelled)
+
+
+async def check_hedge_fallback_not_cached():
+    remote = StubConnector("primary", result={"cat": True, "prey": True}, delay=5.0)
+    local = StubConnector("local", delay=0.01)
+    pool = detector_ha.HedgedConnector([(remote, 0.0, True), (local, 0.0, False)], budget=0.3)
+    connector = detector_ha.CachedConnector(pool)
+    image = jpeg((200, 120, 40))
+    result = await connector.analyze_image_data(image)
+    assert result["backend"] == "local" and result["confident"] is False, result
+    assert remote.cancelled == 1, remote.cancelled
+    # Le verdict de secours n'est pas réutilisé: l'image suivante interroge de nouveau le pool
+    assert connector.entries == {}, connector.entries
+    result = await connector.analyze_image_data(image)
+    assert not result.get("cached") and len(local.calls) == 2, (result, local.calls)
+
+
+async def check_breaker_opens_on_timeouts():
+    hung = StubConnector("primary", delay=60.0)
+    breaker = detector_ha.CircuitBreaker("primary", failure_threshold=2, reset_timeout=60)
+    pool = detector_ha.HedgedConnector([(detector_ha.GuardedConnector(hung, breaker=breaker), 0.0, True)], budget=0.1)
+    results = [await pool.analyze_image_data(b"image") for _ in range(4)]
+    assert breaker.state == breaker.OPEN, (breaker.state, breaker.failures)
+    # Deux requêtes annulées ouvrent le disjoncteur: les suivantes sont refusées sans appel
+    assert len(hung.calls) == 2 and hung.cancelled == 2, (hung.calls, hung.cancelled)
+    assert [result.get("error") for result in results[2:]] == ["circuit_open"] * 2, results
+
+
+CHECKS = [
+    ("pré-filtre: image écartée ou transmise", check_prefilter_skip_and_pass),
+    ("pré-filtre: erreur du modèle local", check_prefilter_error),
+    ("pré-filtre: images d'un passage", check_prefilter_frames),
+    ("cache: verdicts propres à chaque canal", check_cache_per_channel),
+    ("pool: délai avant le backend de relève", check_hedge_delay),
+    ("pool: requête perdante annulée", check_hedge_cancels_loser),
+    ("pool: verdict de secours non mis en cache", check_hedge_fallback_not_cached),
+    ("disjoncteur: ouvert après des dépassements du budget", check_breaker_opens_on_timeouts),
+]
+
+
+async def main():
+    failures = 0
+    for name, check in CHECKS:
+        try:
+            await check()
+            print(f"OK     {name}")
+        except Exception as e:
+            failures += 1
+            print(f"ÉCHEC  {name}: {type(e).__name__}: {e}")
+    return failures
+
+
+if __name__ == "__main__":
+    # Les avertissements attendus (erreurs simulées) encombreraient la sortie
+    logging.basicConfig(level=logging.ERROR)
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,231 @@
+"""
+Vérification du client Home Assistant (HomeAssistantClient) contre un Home Assistant
+simulé en local: serveur aiohttp exposant l'API WebSocket et l'API REST.
+
+Scénarios vérifiés:
+- authentification WebSocket puis appel de service et événement par le WebSocket
+- token refusé: pas de WebSocket, et l'appel REST rejeté (401) remonte en erreur
+- erreur renvoyée par le WebSocket: repli sur l'API REST pour cet appel
+- coupure du WebSocket: reconnexion automatique, les appels repassent par le WebSocket
+- première URL REST injoignable: repli sur la suivante, mémorisée pour les appels suivants
+
+Aucun accès réseau n'est nécessaire. Code de sortie 1 si une vérification échoue.
+
+Utilisation:
+    python benchmarks/ha_client_check.py
+"""
+import asyncio
+import logging
+import os
+import socket
+import sys
+
+from aiohttp import WSMsgType, web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import detector_ha  # noqa: E402
+
+TOKEN = "stub-token"
+
+
+class StubHomeAssistant:
+    """Home Assistant simulé: enregistre les appels reçus par WebSocket et par REST"""
+
+    def __init__(self):
+        self.calls = []
+        self.websockets = set()
+        self.fail_next_websocket_call = False
+        self.app = web.Application()
+        self.app.router.add_get("/api/websocket", self.websocket)
+        self.app.router.add_post("/api/services/{domain}/{service}", self.rest_service)
+        self.app.router.add_post("/api/events/{event_type}", self.rest_event)
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def drop_websockets(self):
+        """Coupe les connexions WebSocket, comme un redémarrage de Home Assistant"""
+        for websocket in list(self.websockets):
+            await websocket.close()
+
+    def _authorized(self, request):
+        return request.headers.get("Authorization") == f"Bearer {TOKEN}"
+
+    async def websocket(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        await websocket.send_json({"type": "auth_required"})
+        message = await websocket.receive_json()
+        if message.get("access_token") != TOKEN:
+            await websocket.send_json({"type": "auth_invalid", "message": "Invalid access token"})
+            await websocket.close()
+            return websocket
+        await websocket.send_json({"type": "auth_ok"})
+
+        self.websockets.add(websocket)
+        try:
+            async for msg in websocket:
+                if msg.type != WSMsgType.TEXT:
+                    break
+                message = msg.json()
+                if self.fail_next_websocket_call:
+                    self.fail_next_websocket_call = False
+                    await websocket.send_json({"id": message["id"], "type": "result", "success": False,
+                                               "error": {"code": "unknown_error", "message": "Erreur simulée"}})
+                    continue
+                self.calls.append(("websocket", message["type"]))
+                await websocket.send_json({"id": message["id"], "type": "result", "success": True, "result": None})
+        finally:
+            self.websockets.discard(websocket)
+        return websocket
+
+    async def rest_service(self, request):
+        if not self._authorized(request):
+            return web.Response(status=401, text="Unauthorized")
+        self.calls.append(("rest", "call_service"))
+        return web.json_response([])
+
+    async def rest_event(self, request):
+        if not self._authorized(request):
+            return web.Response(status=401, text="Unauthorized")
+        self.calls.append(("rest", "fire_event"))
+        return web.json_response({"message": "Event fired."})
+
+
+def closed_port_url():
+    """URL d'un port local sur lequel rien n'écoute"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api"
+
+
+async def wait_connected(client, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not client.connected and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+    return client.connected
+
+
+async def check_websocket(stub):
+    client = detector_ha.HomeAssistantClient(TOKEN, f"{stub.url}/api/websocket", [f"{stub.url}/api"])
+    await client.start()
+    try:
+        assert await wait_connected(client), "WebSocket non connecté"
+        stub.calls.clear()
+        await client.call_service("automation", "trigger", {"entity_id": "automation.cat"})
+        await client.fire_event("cat_detector_detection", {"verdict": "cat"})
+        assert stub.calls == [("websocket", "call_service"), ("websocket", "fire_event")], stub.calls
+    finally:
+        await client.close()
+
+
+async def check_auth_refused(stub):
+    client = detector_ha.HomeAssistantClient("mauvais-token", f"{stub.url}/api/websocket", [f"{stub.url}/api"])
+    await client.start()
+    try:
+        await asyncio.sleep(0.3)
+        assert not client.connected, "WebSocket connecté avec un token refusé"
+        # Le stub refuse aussi le mauvais token en REST: l'appel doit échouer
+        stub.calls.clear()
+        try:
+            await client.call_service("automation", "trigger", {"entity_id": "automation.cat"})
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("Appel accepté avec un token refusé")
+        assert stub.calls == [], stub.calls
+    finally:
+        await client.close()
+
+
+async def check_websocket_error(stub):
+    client = detector_ha.HomeAssistantClient(TOKEN, f"{stub.url}/api/websocket", [f"{stub.url}/api"])
+    await client.start()
+    try:
+        assert await wait_connected(client), "WebSocket non connecté"
+        stub.calls.clear()
+        stub.fail_next_websocket_call = True
+        await client.call_service("automation", "trigger", {"entity_id": "automation.cat"})
+        assert stub.calls == [("rest", "call_service")], stub.calls
+    finally:
+        await client.close()
+
+
+async def check_reconnect(stub):
+    client = detector_ha.HomeAssistantClient(TOKEN, f"{stub.url}/api/websocket", [f"{stub.url}/api"])
+    await client.start()
+    try:
+        assert await wait_connected(client), "WebSocket non connecté"
+        await stub.drop_websockets()
+        await asyncio.sleep(0.1)
+        stub.calls.clear()
+        # Pendant la coupure, l'appel passe par REST
+        await client.call_service("automation", "trigger", {"entity_id": "automation.cat"})
+        assert stub.calls == [("rest", "call_service")], stub.calls
+        assert await wait_connected(client), "WebSocket non reconnecté"
+        stub.calls.clear()
+        await client.call_service("automation", "trigger", {"entity_id": "automation.cat"})
+        assert stub.calls == [("websocket", "call_service")], stub.calls
+    finally:
+        await client.close()
+
+
+async def check_rest_fallback(stub):
+    dead_url = closed_port_url()
+    client = detector_ha.HomeAssistantClient(
+        TOKEN, f"{closed_port_url()}/websocket", [dead_url, f"{stub.url}/api"], timeout=2.0
+    )
+    await client.start()
+    try:
+        stub.calls.clear()
+        await client.fire_event("cat_detector_detection", {"verdict": "cat"})
+        assert stub.calls == [("rest", "fire_event")], stub.calls
+        # L'URL qui a fonctionné est essayée en premier ensuite
+        assert client.rest_urls[0] == f"{stub.url}/api", client.rest_urls
+    finally:
+        await client.close()
+
+
+CHECKS = [
+    ("authentification et appels WebSocket", check_websocket),
+    ("token refusé", check_auth_refused),
+    ("erreur WebSocket, repli REST", check_websocket_error),
+    ("reconnexion WebSocket", check_reconnect),
+    ("repli sur la seconde URL REST", check_rest_fallback),
+]
+
+
+async def main():
+    stub = StubHomeAssistant()
+    await stub.start()
+    failures = 0
+    try:
+        for name, check in CHECKS:
+            try:
+                await check(stub)
+                print(f"OK     {name}")
+            except Exception as e:
+                failures += 1
+                print(f"ÉCHEC  {name}: {type(e).__name__}: {e}")
+    finally:
+        await stub.stop()
+    return failures
+
+
+if __name__ == "__main__":
+    # Les avertissements attendus (repli REST, coupures) encombreraient la sortie
+    logging.basicConfig(level=logging.ERROR)
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,405 @@
+"""
+Benchmark de latence de bout en bout: du passage de l'état "dog_cat" de la caméra
+au déclenchement de l'automatisation Home Assistant.
+
+Le détecteur réel (CatDetector et DetectionPipeline) est branché sur une caméra simulée
+qui rejoue un scénario (passages de chats sur un ou plusieurs canaux, latence et erreurs
+injectées), un connecteur IA simulé et un client Home Assistant simulé. Aucun accès réseau
+n'est nécessaire: le benchmark peut tourner en intégration continue.
+
+Utilisation:
+    python benchmarks/latency_bench.py --scenario steady --mode push --duration 30
+    python benchmarks/latency_bench.py --scenario nvr --json results.json --max-p95 2500 --max-missed 0
+    python benchmarks/latency_bench.py --scenario silent --max-missed 0
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Dossier de travail: configuration minimale du détecteur, logs et captures
+WORK_DIR = tempfile.mkdtemp(prefix="cat_detector_bench_")
+
+SCENARIOS = {
+    # Une caméra, un chat toutes les quelques secondes
+    "steady": {"channels": 1, "interval": 4.0, "visit": 2.0, "camera_latency": 0.03,
+               "snapshot_latency": 0.15, "ai_latency": 0.8, "error_rate": 0.0},
+    # NVR à 4 canaux, passages simultanés: met à l'épreuve les files du pipeline
+    "nvr": {"channels": 4, "interval": 3.0, "visit": 1.5, "camera_latency": 0.03,
+            "snapshot_latency": 0.2, "ai_latency": 1.0, "error_rate": 0.0},
+    # Caméra et IA instables: pics de latence et erreurs
+    "flaky": {"channels": 1, "interval": 4.0, "visit": 2.0, "camera_latency": 0.1,
+              "snapshot_latency": 0.4, "ai_latency": 1.5, "error_rate": 0.1},
+    # Caméra qui accepte l'abonnement sans jamais pousser d'événement: le chien de garde
+    # doit repasser en polling
+    "silent": {"channels": 1, "interval": 4.0, "visit": 2.0, "camera_latency": 0.03,
+               "snapshot_latency": 0.15, "ai_latency": 0.8, "error_rate": 0.0, "push": False},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="steady")
+    parser.add_argument("--mode", choices=["push", "poll"], default="push", help="Mode de surveillance")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée du scénario en secondes")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--policy", default="coalesce", help="Politique des files du pipeline")
+    parser.add_argument("--no-storage", action="store_true", help="Ne pas enregistrer les captures")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Écrire les résultats dans ce fichier JSON")
+    parser.add_argument("--max-p95", type=float, help="Échec (code 1) si le p95 total dépasse ce seuil en ms")
+    parser.add_argument("--max-missed", type=int, help="Échec (code 1) au-delà de ce nombre de passages manqués")
+    return parser.parse_args()
+
+
+args = parse_args()
+with open(os.path.join(WORK_DIR, "options.json"), "w") as f:
+    json.dump({
+        "camera_ip": "192.0.2.1",
+        "username": "bench",
+        "password": "bench",
+        "gemini_api_key": "bench",
+        "event_mode": args.mode,
+        "poll_interval": args.poll_interval,
+        "pipeline_policy": args.policy,
+        # Chien de garde court: le scénario "silent" doit repasser en polling rapidement
+        "push_watchdog": 2,
+        # Passages du scénario bien séparés: un passage simulé = un passage du détecteur
+        "visit_debounce": 0.5,
+        "visit_cooldown": 0,
+        "automation_with_prey": "automation.prey",
+        "automation_without_prey": "automation.cat",
+    }, f)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import logging  # noqa: E402
+
+from PIL import Image  # noqa: E402
+from reolink_aio.exceptions import ReolinkError  # noqa: E402
+
+import detector_ha  # noqa: E402
+
+detector_ha.setup_logging(os.path.join(WORK_DIR, "cat_detector_logs.txt"))
+detector_ha.load_config(os.path.join(WORK_DIR, "options.json"))
+
+# Les logs par détection fausseraient les mesures en console
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * ratio), len(values) - 1)]
+
+
+def make_snapshot(width=1920, height=1080):
+    """Image JPEG de la taille d'une capture réelle"""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class Visit:
+    """Passage d'un chat devant un canal, rejoué par la caméra simulée"""
+
+    def __init__(self, channel, start, end):
+        self.channel = channel
+        self.start = start
+        self.end = end
+        self.triggered_at = None
+        self.notified_at = None
+        self.timings = None
+
+
+class FakeBaichuan:
+    """
+    Partie "événements poussés" de reolink_aio: callbacks appelés par la timeline
+
+    Comme reolink_aio, subscribe_events() réussit même si la caméra ne pousse rien:
+    events_active ne passe à True qu'à la réception d'un événement.
+    """
+
+    def __init__(self, pushes=True):
+        self.pushes = pushes
+        self.callbacks = {}
+        self.subscribed = False
+        self.events_active = False
+
+    def register_callback(self, callback_id, callback, cmd_id=None, channel=None):
+        self.callbacks[callback_id] = (channel, callback)
+
+    def unregister_callback(self, callback_id):
+        self.callbacks.pop(callback_id, None)
+
+    async def subscribe_events(self):
+        self.subscribed = True
+
+    async def unsubscribe_events(self):
+        self.subscribed = False
+        self.events_active = False
+
+    async def check_subscribe_events(self):
+        pass
+
+    def notify(self, channel):
+        if not (self.subscribed and self.pushes):
+            return
+        self.events_active = True
+        for callback_channel, callback in list(self.callbacks.values()):
+            if callback_channel == channel:
+                callback()
+
+
+class FakeHost:
+    """
+    Caméra simulée: rejoue une liste de passages, avec latence injectée sur les appels
+    HTTP et erreurs injectées sur les captures
+    """
+
+    def __init__(self, visits, snapshot, camera_latency, snapshot_latency, error_rate, rng, pushes=True):
+        self.visits = visits
+        self.snapshot = snapshot
+        self.camera_latency = camera_latency
+        self.snapshot_latency = snapshot_latency
+        self.error_rate = error_rate
+        self.rng = rng
+        self.baichuan = FakeBaichuan(pushes)
+        self.errors = 0
+        # Lectures d'état par polling (repli quand la caméra ne pousse pas d'événement)
+        self.polls = 0
+
+    async def _request(self, latency, error_rate=0.0):
+        # Latence log-normale autour de la valeur nominale, avec quelques pics
+        await asyncio.sleep(latency * self.rng.lognormvariate(0, 0.3))
+        if self.rng.random() < error_rate:
+            self.errors += 1
+            raise ReolinkError("Erreur simulée")
+
+    def current_visit(self, channel):
+        now = time.perf_counter()
+        for visit in self.visits:
+            if visit.channel == channel and visit.start <= now < visit.end:
+                return visit
+        return None
+
+    def visit_before(self, channel, at):
+        """Dernier passage commencé avant l'instant donné sur ce canal"""
+        started = [visit for visit in self.visits if visit.channel == channel and visit.start <= at]
+        return max(started, key=lambda visit: visit.start, default=None)
+
+    async def get_host_data(self):
+        await self._request(self.camera_latency)
+
+    async def logout(self):
+        pass
+
+    async def get_motion_state(self, channel):
+        self.polls += 1
+        await self._request(self.camera_latency)
+        return self.current_visit(channel) is not None
+
+    async def get_ai_state(self, channel):
+        await self._request(self.camera_latency)
+        detected = self.current_visit(channel) is not None
+        return {"dog_cat": detected, "people": False, "vehicle": False}
+
+    async def get_ai_state_all_ch(self):
+        await self._request(self.camera_latency)
+
+    def motion_detected(self, channel):
+        return self.current_visit(channel) is not None
+
+    def ai_detected(self, channel, object_type):
+        return object_type == "dog_cat" and self.current_visit(channel) is not None
+
+    async def get_snapshot(self, channel):
+        # Les erreurs sont injectées sur les captures, l'état reste lisible
+        await self._request(self.snapshot_latency, self.error_rate)
+        return self.snapshot
+
+    async def play(self):
+        """Pousse un événement à chaque début et fin de passage, comme la caméra"""
+        edges = sorted(
+            [(visit.start, visit.channel) for visit in self.visits]
+            + [(visit.end, visit.channel) for visit in self.visits]
+        )
+        for at, channel in edges:
+            await asyncio.sleep(max(at - time.perf_counter(), 0))
+            self.baichuan.notify(channel)
+
+
+class FakeConnector(detector_ha.AIConnector):
+    """Connecteur IA simulé: latence d'un appel distant et verdict tiré du scénario"""
+
+    def __init__(self, latency, error_rate, rng):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = rng
+        self.calls = 0
+
+    async def analyze_image_data(self, image_data):
+        self.calls += 1
+        await asyncio.sleep(self.latency * self.rng.lognormvariate(0, 0.3))
+        if self.rng.random() < self.error_rate:
+            return {"cat": False, "prey": False, "error": "api"}
+        return {"cat": True, "prey": self.rng.random() < 0.2}
+
+
+class FakeHomeAssistant:
+    """Client Home Assistant simulé: un aller-retour WebSocket local"""
+
+    def __init__(self, latency=0.005):
+        self.latency = latency
+        self.automations = 0
+
+    async def trigger_automation(self, automation_id):
+        await asyncio.sleep(self.latency)
+        self.automations += 1
+
+    async def fire_event(self, event_type, data=None):
+        await asyncio.sleep(self.latency)
+
+
+class BenchPipeline(detector_ha.DetectionPipeline):
+    """Pipeline réel qui rattache chaque détection notifiée au passage qui l'a déclenchée"""
+
+    async def notify(self, event):
+        started = time.perf_counter()
+        result = await super().notify(event)
+        finished = time.perf_counter()
+        visit = event.detector.api.visit_before(event.channel, event.triggered_at)
+        if visit is not None and visit.notified_at is None:
+            visit.triggered_at = event.triggered_at
+            visit.notified_at = finished
+            visit.timings = dict(event.timings, notify=(finished - started) * 1000)
+        return result
+
+
+def build_visits(scenario, duration, rng, start):
+    """Passages réguliers (avec un peu de gigue) sur chaque canal pendant toute la durée"""
+    visits = []
+    for channel in range(scenario["channels"]):
+        at = start + 1.0
+        while at + scenario["visit"] < start + duration:
+            visits.append(Visit(channel, at, at + scenario["visit"]))
+            at += scenario["interval"] * rng.uniform(0.8, 1.2)
+    return visits
+
+
+async def run(scenario):
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    visits = build_visits(scenario, args.duration, rng, start)
+    host = FakeHost(visits, make_snapshot(), scenario["camera_latency"], scenario["snapshot_latency"],
+                    scenario["error_rate"], rng, scenario.get("push", True))
+    ha_client = FakeHomeAssistant()
+
+    storage = index = None
+    if not args.no_storage:
+        storage = detector_ha.CaptureStorage(os.path.join(WORK_DIR, "media"), os.path.join(WORK_DIR, "thumbs"))
+        index = detector_ha.DetectionIndex(os.path.join(WORK_DIR, "cat_detector.db"), storage.images_dir)
+        await index.open()
+
+    pipeline = BenchPipeline(
+        ha_client, storage, index, detector_ha.PIPELINE_QUEUE_SIZE, args.policy,
+        detector_ha.CAPTURE_WORKERS, detector_ha.ANALYZE_WORKERS,
+    )
+    connector = FakeConnector(scenario["ai_latency"], scenario["error_rate"], rng)
+    camera_connector = connector
+    if detector_ha.UPLOAD_MAX_EDGE:
+        camera_connector = detector_ha.PreprocessConnector(
+            connector, None, detector_ha.UPLOAD_MAX_EDGE, detector_ha.UPLOAD_JPEG_QUALITY
+        )
+    detector = detector_ha.CatDetector(
+        "192.0.2.1", "bench", "bench", camera_connector, pipeline,
+        name="bench", channels=range(scenario["channels"]), host=host,
+    )
+
+    tasks = [
+        asyncio.create_task(pipeline.run()),
+        asyncio.create_task(host.play()),
+        asyncio.create_task(detector.run()),
+    ]
+    # Laisser au pipeline le temps de terminer les derniers passages
+    await asyncio.sleep(args.duration + scenario["ai_latency"] * 3 + 2)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if index:
+        index.close()
+
+    return visits, pipeline, host, connector, ha_client
+
+
+def report(visits, pipeline, host, connector, ha_client):
+    notified = [visit for visit in visits if visit.notified_at is not None]
+    stages = {
+        "detect": [(visit.triggered_at - visit.start) * 1000 for visit in notified],
+        "capture": [visit.timings.get("capture", 0.0) for visit in notified],
+        "analyze": [visit.timings.get("analyze", 0.0) for visit in notified],
+        "persist": [visit.timings.get("persist", 0.0) for visit in notified],
+        "notify": [visit.timings.get("notify", 0.0) for visit in notified],
+        "total": [(visit.notified_at - visit.start) * 1000 for visit in notified],
+    }
+    results = {
+        "scenario": args.scenario,
+        "mode": args.mode,
+        "visits": len(visits),
+        "notified": len(notified),
+        "missed": len(visits) - len(notified),
+        "dropped": sum(queue.dropped for _, queue, *_ in pipeline.stages),
+        "throughput_per_min": len(notified) / args.duration * 60,
+        "camera_errors": host.errors,
+        "camera_polls": host.polls,
+        "ai_calls": connector.calls,
+        "automations": ha_client.automations,
+        "stages": {
+            stage: {
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "mean": statistics.fmean(values) if values else 0.0,
+            }
+            for stage, values in stages.items()
+        },
+    }
+
+    print(f"Scénario {args.scenario} ({args.mode}), {args.duration:.0f} s")
+    print(
+        f"  passages {results['visits']}, notifiés {results['notified']}, manqués {results['missed']}, "
+        f"abandonnés {results['dropped']}, débit {results['throughput_per_min']:.1f}/min, "
+        f"erreurs caméra {results['camera_errors']}, lectures par polling {results['camera_polls']}"
+    )
+    print(f"  {'étage':<10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, values in results["stages"].items():
+        print(f"  {stage:<10}{values['p50']:>8.0f}ms{values['p95']:>8.0f}ms{values['p99']:>8.0f}ms")
+    return results
+
+
+def main():
+    results = report(*asyncio.run(run(SCENARIOS[args.scenario])))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    failed = False
+    if args.max_p95 is not None and results["stages"]["total"]["p95"] > args.max_p95:
+        print(f"ÉCHEC: p95 total supérieur à {args.max_p95:.0f} ms")
+        failed = True
+    if args.max_missed is not None and results["missed"] > args.max_missed:
+        print(f"ÉCHEC: plus de {args.max_missed} passages manqués")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
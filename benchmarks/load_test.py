@@ -0,0 +1,109 @@
+"""
+Test de charge du serveur web: simule des navigateurs qui ouvrent la galerie.
+
+Chaque navigateur virtuel garde ouverts les flux SSE (détections et logs) comme la page
+réelle, et recharge la page principale et ses miniatures en boucle. Le nombre de
+navigateurs est augmenté par paliers pour trouver la limite supportée par la machine.
+
+Utilisation:
+    python benchmarks/load_test.py --url http://127.0.0.1:8099/ --viewers 10,50,100 --duration 20
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import time
+
+import aiohttp
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * ratio), len(values) - 1)]
+
+
+async def keep_stream_open(session, url, stop):
+    """Garde un flux SSE ouvert en consommant les messages, comme un navigateur"""
+    try:
+        async with session.get(url) as response:
+            while not stop.is_set():
+                await asyncio.wait_for(response.content.readline(), timeout=30)
+    except (asyncio.TimeoutError, aiohttp.ClientError, asyncio.CancelledError):
+        pass
+
+
+async def viewer(session, base_url, stop, stats):
+    """Navigateur virtuel: page principale, miniatures, puis pause avant rechargement"""
+    streams = [
+        asyncio.create_task(keep_stream_open(session, base_url + "events", stop)),
+        asyncio.create_task(keep_stream_open(session, base_url + "logs/stream", stop)),
+    ]
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url) as response:
+                    html = await response.text()
+                    if response.status != 200:
+                        stats["errors"] += 1
+                        continue
+                for thumb in re.findall(r'src="(thumbs/[^"]+)"', html):
+                    async with session.get(base_url + thumb) as response:
+                        stats["bytes"] += len(await response.read())
+                        stats["requests"] += 1
+                stats["requests"] += 1
+                stats["latencies"].append((time.perf_counter() - started) * 1000)
+            except aiohttp.ClientError:
+                stats["errors"] += 1
+            await asyncio.sleep(1)
+    finally:
+        for stream in streams:
+            stream.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+
+
+async def run_step(base_url, viewers, duration):
+    stats = {"requests": 0, "errors": 0, "bytes": 0, "latencies": []}
+    stop = asyncio.Event()
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [asyncio.create_task(viewer(session, base_url, stop, stats)) for _ in range(viewers)]
+        await asyncio.sleep(duration)
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = stats["latencies"]
+    print(
+        f"{viewers:5d} navigateurs | {stats['requests'] / duration:7.1f} req/s | "
+        f"page+miniatures p50 {percentile(latencies, 0.5):7.1f} ms, "
+        f"p95 {percentile(latencies, 0.95):7.1f} ms, p99 {percentile(latencies, 0.99):7.1f} ms | "
+        f"{stats['bytes'] / duration / 1024:8.1f} Ko/s | erreurs {stats['errors']}"
+    )
+    return statistics.median(latencies) if latencies else float("inf")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8099/", help="URL de la page principale")
+    parser.add_argument("--viewers", default="1,10,25,50,100", help="Paliers de navigateurs simultanés")
+    parser.add_argument("--duration", type=float, default=15, help="Durée de chaque palier en secondes")
+    parser.add_argument("--max-latency", type=float, default=1000,
+                        help="Latence médiane (ms) au-delà de laquelle la machine est considérée saturée")
+    args = parser.parse_args()
+
+    base_url = args.url if args.url.endswith("/") else args.url + "/"
+    supported = 0
+    for viewers in (int(value) for value in args.viewers.split(",")):
+        median = await run_step(base_url, viewers, args.duration)
+        if median > args.max_latency:
+            break
+        supported = viewers
+    print(f"Navigateurs simultanés supportés (médiane < {args.max_latency:.0f} ms): {supported}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
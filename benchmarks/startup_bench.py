@@ -0,0 +1,152 @@
+"""
+Benchmark du démarrage: délai entre le lancement du processus et la première lecture
+de l'état de la caméra (time-to-first-poll), pendant lequel le détecteur est aveugle.
+
+Chaque mesure lance un nouveau processus Python (imports à froid), qui démarre le
+détecteur réel sur une caméra simulée dont la connexion prend --login-latency secondes.
+Le client Gemini est réellement préparé (import du SDK), sans appel réseau, en tâche de
+fond: la phase ai_ready (fin de sa préparation) ne doit pas retarder first_poll.
+
+Utilisation:
+    python benchmarks/startup_bench.py --runs 5
+    python benchmarks/startup_bench.py --json startup.json --max-ms 3000
+"""
+import time
+
+# Origine des mesures du processus enfant, avant tout autre import
+CHILD_STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PHASES = ["import", "configure", "warm_up", "first_poll", "total", "ai_ready"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Nombre de démarrages mesurés")
+    parser.add_argument("--login-latency", type=float, default=0.5,
+                        help="Durée de la connexion à la caméra simulée en secondes")
+    parser.add_argument("--no-gemini", action="store_true", help="Ne pas préparer le client Gemini")
+    parser.add_argument("--json", help="Écrire les résultats dans ce fichier JSON")
+    parser.add_argument("--max-ms", type=float, help="Échec (code 1) si le délai médian dépasse ce seuil en ms")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+class FakeHost:
+    """Caméra simulée: connexion lente, état lu instantanément"""
+
+    def __init__(self, login_latency):
+        self.login_latency = login_latency
+
+    async def get_host_data(self):
+        await asyncio.sleep(self.login_latency)
+
+    async def logout(self):
+        pass
+
+    async def get_motion_state(self, channel):
+        return False
+
+    async def get_ai_state(self, channel):
+        return {"dog_cat": False, "people": False, "vehicle": False}
+
+
+async def child(args):
+    """Démarre le détecteur comme main() et affiche la durée de chaque étape en JSON"""
+    sys.path.insert(0, ROOT_DIR)
+    import detector_ha
+
+    imported = time.perf_counter()
+    work_dir = tempfile.mkdtemp(prefix="cat_detector_startup_")
+    detector_ha.setup_logging(os.path.join(work_dir, "cat_detector_logs.txt"))
+    detector_ha.configure({
+        "camera_ip": "192.0.2.1",
+        "username": "bench",
+        "password": "bench",
+        "gemini_api_key": "" if args.no_gemini else "bench",
+        "event_mode": "poll",
+        "save_images": False,
+    })
+    ai_connector = detector_ha.build_ai_connector()
+    pipeline = detector_ha.DetectionPipeline(None)
+    detectors = detector_ha.build_detectors(
+        ai_connector, pipeline, host_factory=lambda camera: FakeHost(args.login_latency)
+    )
+    configured = time.perf_counter()
+
+    ai_ready = await detector_ha.warm_up(detectors, ai_connector)
+    warmed = time.perf_counter()
+
+    monitoring = asyncio.gather(*(detector.run() for detector in detectors))
+    await detector_ha.monitoring_started.wait()
+    first_poll = time.perf_counter()
+    print(json.dumps({
+        "import": (imported - CHILD_STARTED) * 1000,
+        "configure": (configured - imported) * 1000,
+        "warm_up": (warmed - configured) * 1000,
+        "first_poll": (first_poll - warmed) * 1000,
+    }), flush=True)
+    # Seconde ligne: fin de la préparation du client d'IA, depuis le lancement du processus
+    await ai_ready
+    print(json.dumps({"ai_ready": (time.perf_counter() - CHILD_STARTED) * 1000}), flush=True)
+
+    monitoring.cancel()
+    await asyncio.gather(monitoring, return_exceptions=True)
+    await ai_connector.close()
+
+
+def run_once(args):
+    """Lance un processus enfant et mesure le délai jusqu'à sa première lecture d'état"""
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--login-latency", str(args.login_latency)]
+    if args.no_gemini:
+        command.append("--no-gemini")
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = process.stdout.readline()
+    total = (time.perf_counter() - started) * 1000
+    ai_line = process.stdout.readline()
+    process.wait()
+    if not line or not ai_line:
+        raise RuntimeError(f"Le détecteur n'a pas démarré (code {process.returncode})")
+    return dict(json.loads(line), **json.loads(ai_line), total=total)
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        asyncio.run(child(args))
+        return
+
+    runs = [run_once(args) for _ in range(args.runs)]
+    results = {
+        phase: {
+            "median": statistics.median(run[phase] for run in runs),
+            "max": max(run[phase] for run in runs),
+        }
+        for phase in PHASES
+    }
+
+    print(f"Démarrage du détecteur ({args.runs} mesures, connexion caméra {args.login_latency * 1000:.0f} ms)")
+    print(f"  {'étape':<12}{'médiane':>10}{'max':>10}")
+    for phase in PHASES:
+        print(f"  {phase:<12}{results[phase]['median']:>8.0f}ms{results[phase]['max']:>8.0f}ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": runs, "phases": results}, f, indent=2)
+    if args.max_ms is not None and results["total"]["median"] > args.max_ms:
+        print(f"ÉCHEC: délai médian avant la première lecture supérieur à {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,8 @@
 echo "Démarrage du Détecteur de Chat..."
 
 # Vérifier l'existence des fichiers nécessaires
-if [ ! -f "/app/detector.py" ]; then
-    echo "ERREUR: Le fichier detector.py est introuvable!"
+if [ ! -f "/app/detector_ha.py" ]; then
+    echo "ERREUR: Le fichier detector_ha.py est introuvable!"
     exit 1
 fi
 
@@ -51,7 +51,7 @@ fi
 
 # Lancer le détecteur de chat
 echo "Démarrage du détecteur de chat..."
-python /app/detector.py
+python /app/detector_ha.py
 
 # Si le détecteur se termine, arrêter aussi le serveur web
 kill $WEBSERVER_PID
\ No newline at end of file
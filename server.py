@@ -1,13 +1,22 @@
-from flask import Flask, render_template, send_from_directory, Response, redirect, url_for, request
+from aiohttp import web
+from abc import ABC, abstractmethod
+from html import escape
+import asyncio
 import os
 import glob
 import logging
 from logging.handlers import RotatingFileHandler
-from pathlib import Path
 import sys
+import re
+import sqlite3
+import json
+import threading
+import time
+from PIL import Image
 
-# Initialiser l'application Flask
-app = Flask(__name__)
+# Routes de l'application web (serveur asynchrone aiohttp)
+routes = web.RouteTableDef()
+logger = logging.getLogger("cat_detector.web")
 
 # Configuration du logger
 log_file = "/share/cat_detector_logs.txt"
@@ -17,57 +26,399 @@ os.makedirs("/share", exist_ok=True)
 # Dossier où sont stockées les images
 IMAGES_DIR = "/media/cat_detector"
 
+# Index SQLite des détections, alimenté par le détecteur
+DB_PATH = "/share/cat_detector.db"
+
+# Métriques exportées par le détecteur au format texte Prometheus
+METRICS_PATH = "/share/cat_detector_metrics.prom"
+
+# Cache des miniatures de la galerie (même arborescence que IMAGES_DIR)
+THUMBS_DIR = "/share/cat_detector_thumbs"
+THUMB_SIZE = 400  # 2x la taille affichée, pour les écrans haute densité
+THUMB_QUALITY = 75
+
+# Les captures et miniatures horodatées ne changent jamais: cache navigateur d'un an
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# latest.jpg change à chaque détection: revalidation systématique par ETag
+REVALIDATE_CACHE = "no-cache"
+
+# Nom des captures: [cat_|cat_with_prey_]AAAAMMJJ_HHMMSS[-mmm[-n]][_camera].jpg
+CAPTURE_NAME_RE = re.compile(r"^(?:(cat_with_prey|cat)_)?(\d{8}_\d{6})(?:-\d+)*(?:_([a-z0-9-]+))?\.jpg$")
+
+def parse_capture_name(filename):
+    """
+    Extrait le type de détection, l'horodatage et la caméra du nom d'une capture
+
+    Returns:
+        tuple: (type de détection ou None, horodatage, libellé de caméra ou None)
+    """
+    match = CAPTURE_NAME_RE.match(os.path.basename(filename))
+    if not match:
+        return None, filename.replace('.jpg', ''), None
+    return match.group(1), match.group(2), match.group(3)
+
+def recent_captures(limit=20):
+    """
+    Liste des dernières captures, lue dans l'index des détections
+
+    Le coût ne dépend pas du nombre de captures conservées. Sans index (détecteur pas
+    encore démarré), le dossier des images est parcouru.
+
+    Returns:
+        list: Dictionnaires avec les clés 'path', 'verdict', 'timestamp' et 'camera'
+        (et 'id' pour les captures indexées)
+    """
+    if os.path.exists(DB_PATH):
+        connection = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(
+                "SELECT id, path, verdict, timestamp, camera FROM detections "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        finally:
+            connection.close()
+        return [
+            {"id": row_id, "path": path, "verdict": verdict, "timestamp": timestamp, "camera": camera}
+            for row_id, path, verdict, timestamp, camera in rows
+        ]
+
+    images = sorted(glob.glob(f"{IMAGES_DIR}/*.jpg"), key=os.path.getmtime, reverse=True)
+    captures = []
+    for img in images:
+        if img.endswith('latest.jpg'):
+            continue
+        detection_type, timestamp, camera = parse_capture_name(img)
+        captures.append({
+            "path": os.path.basename(img),
+            "verdict": detection_type or "none",
+            "timestamp": timestamp,
+            "camera": camera,
+        })
+        if len(captures) >= limit:
+            break
+    return captures
+
+def safe_path(base, filename):
+    """Chemin d'un fichier dans base, ou None si filename sort de ce dossier"""
+    base = os.path.realpath(base)
+    path = os.path.realpath(os.path.join(base, filename))
+    if os.path.commonpath([base, path]) != base:
+        return None
+    return path
+
+class Broadcaster(ABC):
+    """
+    Diffuse des messages à tous les navigateurs abonnés.
+
+    Une seule tâche de fond interroge la source (méthode poll, exécutée hors de la boucle
+    asyncio), quel que soit le nombre de navigateurs ouverts. Elle démarre au premier abonné.
+    """
+
+    def __init__(self, poll_interval=0.5):
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        subscriber = asyncio.Queue(maxsize=100)
+        self.subscribers.add(subscriber)
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, message):
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.put_nowait(message)
+            except asyncio.QueueFull:
+                pass  # Navigateur trop lent: le message apparaîtra au prochain chargement
+
+    @abstractmethod
+    def poll(self):
+        """Retourne la liste des nouveaux messages de la source"""
+        pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                for message in await loop.run_in_executor(None, self.poll):
+                    self.publish(message)
+            except Exception as e:
+                logger.error(f"Erreur dans {type(self).__name__}: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+class DetectionBroadcaster(Broadcaster):
+    """
+    Diffuse les nouvelles détections aux navigateurs connectés.
+
+    Le détecteur publie chaque détection en l'écrivant dans l'index SQLite: PRAGMA
+    data_version (lecture locale sans coût) indique si la base a changé, et seules
+    les nouvelles lignes sont alors lues.
+    """
+
+    def __init__(self, poll_interval=0.5):
+        super().__init__(poll_interval)
+        self.connection = None
+        self.last_version = None
+        self.last_id = None
+
+    def poll(self):
+        if self.connection is None:
+            if not os.path.exists(DB_PATH):
+                return []
+            self.connection = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+            self.last_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM detections").fetchone()[0]
+
+        try:
+            version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            if version == self.last_version:
+                return []
+            self.last_version = version
+            rows = self.connection.execute(
+                "SELECT id, path, verdict, timestamp, camera FROM detections WHERE id > ? ORDER BY id",
+                (self.last_id,),
+            ).fetchall()
+        except Exception:
+            self.connection.close()
+            self.connection = None
+            raise
+
+        captures = []
+        for row_id, path, verdict, timestamp, camera in rows:
+            self.last_id = row_id
+            captures.append({"id": row_id, "path": path, "verdict": verdict,
+                             "timestamp": timestamp, "camera": camera})
+        return captures
+
+class LogFollower(Broadcaster):
+    """
+    Diffuse les nouvelles lignes du fichier de log en suivant la position de lecture.
+
+    Un renouvellement du fichier par RotatingFileHandler (nouvel inode ou fichier
+    raccourci) est détecté et la lecture reprend au début du nouveau fichier.
+    """
+
+    def __init__(self, path, poll_interval=0.5):
+        super().__init__(poll_interval)
+        self.path = path
+        self.file = None
+
+    def poll(self):
+        if self.file is None:
+            if not os.path.exists(self.path):
+                return []
+            self.file = open(self.path, 'rb')
+            self.file.seek(0, os.SEEK_END)
+
+        try:
+            stat = os.stat(self.path)
+            if stat.st_ino != os.fstat(self.file.fileno()).st_ino or stat.st_size < self.file.tell():
+                # Lire la fin de l'ancien fichier avant de passer au nouveau
+                lines = self._read_lines()
+                self.file.close()
+                self.file = open(self.path, 'rb')
+                return lines + self._read_lines()
+        except FileNotFoundError:
+            pass
+        return self._read_lines()
+
+    def _read_lines(self):
+        lines = []
+        while True:
+            line = self.file.readline()
+            if not line.endswith(b"\n"):
+                # Ligne en cours d'écriture: la relire entière au prochain passage
+                self.file.seek(-len(line), os.SEEK_CUR)
+                return lines
+            lines.append(line.decode('utf-8', errors='replace').rstrip())
+
+detection_broadcaster = DetectionBroadcaster()
+log_follower = LogFollower(log_file)
+
+async def stream_events(request, broadcaster, format_message, heartbeat=15):
+    """Réponse Server-Sent Events alimentée par un diffuseur"""
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+    subscriber = broadcaster.subscribe()
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.get(), heartbeat)
+            except asyncio.TimeoutError:
+                await response.write(b": keepalive\n\n")
+                continue
+            await response.write(format_message(message).encode())
+    except ConnectionResetError:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscriber)
+    return response
+
 # Obtenir le préfixe de chemin pour les URL relatives
 def get_relative_url():
     return ""  # URL relatives, fonctionnent avec n'importe quel proxy
 
-@app.route('/')
-def index():
+@routes.get('/')
+async def index(request):
     try:
-        # Créer le dossier d'images s'il n'existe pas
-        os.makedirs(IMAGES_DIR, exist_ok=True)
-        
+        loop = asyncio.get_running_loop()
+
         # Liste des 20 dernières captures
-        images = sorted(glob.glob(f"{IMAGES_DIR}/*.jpg"), reverse=True)
-        # Exclure latest.jpg
-        images = [img for img in images if not img.endswith('latest.jpg')][:20]
-        images = [os.path.basename(img) for img in images]
+        images = await loop.run_in_executor(None, recent_captures, 20)
         
         # Lire les 100 dernières lignes de logs
-        logs = []
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                logs = f.readlines()[-100:]
-        else:
-            logs = ["Aucun log disponible"]
+        logs = await loop.run_in_executor(None, tail_lines, log_file, 100)
+        if not logs:
+            logs = ["Aucun log disponible\n"]
         
         # Utiliser des URLs relatives
         base_url = get_relative_url()
-        app.logger.info(f"Utilisation d'URLs relatives")
         
-        return template(images, logs, base_url)
+        return web.Response(text=template(images, logs, base_url), content_type='text/html')
     except Exception as e:
-        app.logger.error(f"Erreur dans index(): {str(e)}")
-        return f"Erreur: {str(e)}", 500
+        logger.error(f"Erreur dans index(): {str(e)}")
+        return web.Response(text=f"Erreur: {str(e)}", status=500)
 
-@app.route('/images/<path:filename>')
-def image(filename):
+def serve_file(path, cache_control):
+    """
+    Sert un fichier avec sendfile; aiohttp gère ETag/If-None-Match et les requêtes Range
+    """
+    if path is None or not os.path.isfile(path):
+        raise web.HTTPNotFound(text="Image introuvable")
+    return web.FileResponse(path, headers={"Cache-Control": cache_control})
+
+@routes.get('/images/{filename:.+}')
+async def image(request):
+    filename = request.match_info['filename']
+    cache_control = REVALIDATE_CACHE if filename == 'latest.jpg' else IMMUTABLE_CACHE
+    return serve_file(safe_path(IMAGES_DIR, filename), cache_control)
+
+def thumbnail_path(filename):
+    """
+    Retourne le chemin de la miniature d'une capture, en la générant au premier appel
+
+    Returns:
+        str: Chemin de la miniature, ou None si la capture n'existe pas
+    """
+    source = safe_path(IMAGES_DIR, filename)
+    target = safe_path(THUMBS_DIR, filename)
+    if source is None or target is None or not os.path.isfile(source):
+        return None
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with Image.open(source) as img:
+        # Décodage JPEG réduit: inutile de décompresser l'image en pleine résolution
+        img.draft("RGB", (THUMB_SIZE, THUMB_SIZE))
+        img = img.convert("RGB")
+        img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+        # Écriture atomique: une requête concurrente ne lit jamais une miniature partielle
+        temp = f"{target}.{threading.get_ident()}.tmp"
+        img.save(temp, "JPEG", quality=THUMB_QUALITY)
+    os.replace(temp, target)
+    return target
+
+def prune_thumbnails():
+    """Supprime les miniatures dont la capture d'origine n'existe plus"""
+    removed = 0
+    for root, _, files in os.walk(THUMBS_DIR):
+        for name in files:
+            thumb = os.path.join(root, name)
+            relative = os.path.relpath(thumb, THUMBS_DIR)
+            if name.endswith(".tmp") or not os.path.exists(os.path.join(IMAGES_DIR, relative)):
+                os.remove(thumb)
+                removed += 1
+    if removed:
+        logger.info(f"{removed} miniatures orphelines supprimées")
+
+async def prune_thumbnails_periodically(app, interval=3600):
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, prune_thumbnails)
+        except Exception as e:
+            logger.error(f"Erreur lors du nettoyage des miniatures: {str(e)}")
+        await asyncio.sleep(interval)
+
+@routes.get('/thumbs/{filename:.+}')
+async def thumbnail(request):
+    """Sert la miniature d'une capture, générée au premier appel, avec une mise en cache longue durée"""
     try:
-        app.logger.info(f"Requête pour l'image: {filename} via {request.url}")
-        return send_from_directory(IMAGES_DIR, filename)
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, thumbnail_path, request.match_info['filename'])
     except Exception as e:
-        app.logger.error(f"Erreur dans image(): {str(e)}")
-        return f"Erreur: {str(e)}", 500
+        logger.error(f"Erreur dans thumbnail(): {str(e)}")
+        return web.Response(text=f"Erreur: {str(e)}", status=500)
+    return serve_file(path, IMMUTABLE_CACHE)
+
+def _tail_file(path, count, block_size=8192):
+    """Lit les count dernières lignes d'un fichier en lisant des blocs depuis la fin"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # Lire des blocs en remontant jusqu'à avoir count lignes complètes
+        while position > 0 and data.count(b"\n") <= count:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+    lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)
+    # La première ligne est incomplète si la lecture ne remonte pas au début du fichier
+    if position > 0:
+        lines = lines[1:]
+    return lines[-count:]
+
+def tail_lines(path, count=100):
+    """
+    Retourne les count dernières lignes d'un fichier de log, sans lire tout le fichier
 
-@app.route('/view/<path:filename>')
-def view_image(filename):
+    Si le fichier vient d'être renouvelé par RotatingFileHandler, les lignes manquantes
+    sont lues dans la sauvegarde précédente (path.1).
+    """
+    lines = []
+    for candidate in (path, f"{path}.1"):
+        if len(lines) >= count or not os.path.exists(candidate):
+            break
+        lines = _tail_file(candidate, count - len(lines)) + lines
+    return lines
+
+@routes.get('/logs/stream')
+async def logs_stream(request):
+    """Diffuse les nouvelles lignes de log en Server-Sent Events"""
+    return await stream_events(request, log_follower, lambda line: f"data: {line}\n\n")
+
+@routes.get('/events')
+async def detection_events(request):
+    """Diffuse les nouvelles détections en Server-Sent Events (cartes HTML prêtes à insérer)"""
+    def format_detection(capture):
+        data = json.dumps({**capture, "html": render_card(capture)})
+        return f"event: detection\ndata: {data}\n\n"
+
+    return await stream_events(request, detection_broadcaster, format_detection)
+
+@routes.get('/view/{filename:.+}')
+async def view_image(request):
     """Affiche une seule image en plein écran"""
+    filename = request.match_info['filename']
     try:
-        app.logger.info(f"Affichage de l'image en grand: {filename}")
-        
+        # Les captures sont rangées dans des dossiers AAAA/MM/JJ: adapter les URL relatives
+        root = "../" * (filename.count("/") + 1)
+
         # Déterminer si c'est une image de chat avec proie
-        cat_with_prey = "cat_with_prey" in filename
-        cat_only = "cat_" in filename and not cat_with_prey
+        detection_type, timestamp, camera = parse_capture_name(filename)
+        cat_with_prey = detection_type == "cat_with_prey"
+        cat_only = detection_type == "cat"
         
         # Construire le HTML pour afficher l'image en grand
         html = f"""
@@ -96,7 +447,7 @@ def view_image(filename):
             <div class="container">
                 <h1>Détecteur de Chat - Image en grand</h1>
                 <div class="image-container">
-                    <img src="../images/{filename}" class="{
+                    <img src="{root}images/{filename}" class="{
                         'cat-with-prey' if cat_with_prey else 'cat' if cat_only else ''
                     }">
                     {
@@ -104,29 +455,77 @@ def view_image(filename):
                         '<div class="label">CHAT</div>' if cat_only else ''
                     }
                 </div>
-                <div class="timestamp">{filename.replace('.jpg', '').replace('cat_with_prey_', '').replace('cat_', '')}</div>
-                <a href="../" class="back-button">Retour à la liste</a>
+                <div class="timestamp">{timestamp}{f' - {camera}' if camera else ''}</div>
+                <a href="{root}" class="back-button">Retour à la liste</a>
             </div>
         </body>
         </html>
         """
-        return Response(html, mimetype='text/html')
+        return web.Response(text=html, content_type='text/html')
     except Exception as e:
-        app.logger.error(f"Erreur dans view_image(): {str(e)}")
-        return f"Erreur: {str(e)}", 500
+        logger.error(f"Erreur dans view_image(): {str(e)}")
+        return web.Response(text=f"Erreur: {str(e)}", status=500)
 
-@app.route('/latest.jpg')
-def latest_image():
+@routes.get('/latest.jpg')
+async def latest_image(request):
     """Route directe pour servir latest.jpg"""
+    return serve_file(os.path.join(IMAGES_DIR, 'latest.jpg'), REVALIDATE_CACHE)
+
+def read_metrics(path):
+    """Métriques du détecteur, complétées par l'âge du fichier pour détecter un détecteur arrêté"""
+    with open(path) as f:
+        text = f.read()
+        age = time.time() - os.fstat(f.fileno()).st_mtime
+    return (
+        text
+        + "# HELP cat_detector_metrics_age_seconds Âge des métriques exportées par le détecteur\n"
+        + "# TYPE cat_detector_metrics_age_seconds gauge\n"
+        + f"cat_detector_metrics_age_seconds {age:.1f}\n"
+    )
+
+@routes.get('/metrics')
+async def metrics(request):
+    """Métriques au format Prometheus (pipeline de détection, caméra, IA, Home Assistant)"""
     try:
-        app.logger.info(f"Requête pour latest.jpg via {request.url}")
-        return send_from_directory(IMAGES_DIR, 'latest.jpg')
-    except Exception as e:
-        app.logger.error(f"Erreur dans latest_image(): {str(e)}")
-        return f"Erreur: {str(e)}", 500
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, read_metrics, METRICS_PATH)
+    except FileNotFoundError:
+        return web.Response(text="Métriques indisponibles: le détecteur n'a encore rien exporté\n", status=503)
+    return web.Response(text=text, headers={
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+        'Cache-Control': 'no-store',
+    })
+
+def render_card(capture):
+    """Génère le HTML de la carte d'une capture dans la galerie"""
+    img = capture["path"]
+    timestamp = capture["timestamp"]
+    camera = capture["camera"]
+    css_class = ""
+    label = ""
+    if capture["verdict"] == "cat_with_prey":
+        css_class = "cat-with-prey"
+        label = '<div class="label">PROIE</div>'
+    elif capture["verdict"] == "cat":
+        css_class = "cat"
+        label = '<div class="label">CHAT</div>'
+    camera_html = f'<div class="camera">{camera}</div>' if camera else ''
+        
+    return f"""
+                    <div class="image-card">
+                        <a href="view/{img}" class="image-link">
+                            <div class="image-container">
+                                <img src="thumbs/{img}" alt="{img}" class="{css_class}" loading="lazy">
+                                {label}
+                            </div>
+                            <div class="timestamp">{timestamp}</div>
+                            {camera_html}
+                        </a>
+                    </div>
+        """
 
 def template(images, logs, base_url):
-    """Génère le template HTML"""
+    """Génère le template HTML de la page principale"""
     html = f"""
     <!DOCTYPE html>
     <html>
@@ -146,6 +545,7 @@ def template(images, logs, base_url):
             img:hover {{ transform: scale(1.05); box-shadow: 0 3px 10px rgba(0,0,0,0.2); }}
             pre {{ background: #f5f5f5; padding: 10px; border-radius: 5px; overflow: auto; max-height: 400px; }}
             .timestamp {{ font-size: 0.8em; color: #666; }}
+            .camera {{ font-size: 0.8em; color: #03a9f4; }}
             .cat-with-prey {{ border: 3px solid red; }}
             .cat {{ border: 3px solid orange; }}
             h2 {{ border-bottom: 1px solid #eee; padding-bottom: 10px; }}
@@ -162,58 +562,63 @@ def template(images, logs, base_url):
                 return path.substring(0, path.lastIndexOf('/') + 1);
             }}
             
-            // Auto-refresh toutes les 30 secondes
-            setTimeout(function() {{
-                window.location.reload();
-            }}, 30000);
+            document.addEventListener('DOMContentLoaded', function() {{
+                // Ajout en direct des nouvelles détections en tête de la galerie
+                const images = document.getElementById('images');
+                const detections = new EventSource('events');
+                detections.addEventListener('detection', function(event) {{
+                    const capture = JSON.parse(event.data);
+                    const template = document.createElement('template');
+                    template.innerHTML = capture.html.trim();
+                    images.insertBefore(template.content.firstChild, images.firstChild);
+                    while (images.children.length > 20) {{
+                        images.removeChild(images.lastElementChild);
+                    }}
+                }});
+
+                // Ajout en direct des nouvelles lignes de log
+                const logs = document.getElementById('logs');
+                const source = new EventSource('logs/stream');
+                source.onmessage = function(event) {{
+                    const atBottom = logs.scrollTop + logs.clientHeight >= logs.scrollHeight - 5;
+                    logs.appendChild(document.createTextNode(event.data + '\\n'));
+                    while (logs.childNodes.length > 500) {{
+                        logs.removeChild(logs.firstChild);
+                    }}
+                    if (atBottom) {{
+                        logs.scrollTop = logs.scrollHeight;
+                    }}
+                }};
+            }});
         </script>
     </head>
     <body>
         <h1>Détecteur de Chat <a href="." class="refresh">Rafraîchir</a></h1>
         
         <div class="status">
-            <strong>Statut:</strong> Le détecteur est actif et surveille votre caméra
+            <strong>Statut:</strong> Le détecteur est actif et surveille vos caméras
         </div>
         
         <div class="container">
             <div class="section">
                 <h2>Images récentes</h2>
-                <div class="images">
+                <div class="images" id="images">
     """
     
     # Ajouter les images
-    for img in images:
-        css_class = ""
-        label = ""
-        if "cat_with_prey" in img:
-            css_class = "cat-with-prey"
-            label = '<div class="label">PROIE</div>'
-        elif "cat" in img:
-            css_class = "cat"
-            label = '<div class="label">CHAT</div>'
-            
-        html += f"""
-                    <div class="image-card">
-                        <a href="view/{img}" class="image-link">
-                            <div class="image-container">
-                                <img src="images/{img}" alt="{img}" class="{css_class}">
-                                {label}
-                            </div>
-                            <div class="timestamp">{img.replace('.jpg', '').replace('cat_with_prey_', '').replace('cat_', '')}</div>
-                        </a>
-                    </div>
-        """
+    for capture in images:
+        html += render_card(capture)
     
     html += """
                 </div>
             </div>
             <div class="section">
                 <h2>Logs récents</h2>
-                <pre>"""
+                <pre id="logs">"""
     
     # Ajouter les logs
     for log in logs:
-        html += log
+        html += escape(log)
     
     html += """</pre>
             </div>
@@ -221,7 +626,25 @@ def template(images, logs, base_url):
     </body>
     </html>
     """
-    return Response(html, mimetype='text/html')
+    return html
+
+async def start_background_tasks(app):
+    # Nettoyage périodique des miniatures dont la capture a été supprimée
+    app['prune_thumbnails'] = asyncio.create_task(prune_thumbnails_periodically(app))
+
+async def stop_background_tasks(app):
+    tasks = [app['prune_thumbnails'], detection_broadcaster.task, log_follower.task]
+    for task in tasks:
+        if task is not None:
+            task.cancel()
+
+def create_app():
+    """Crée l'application web"""
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(start_background_tasks)
+    app.on_cleanup.append(stop_background_tasks)
+    return app
 
 if __name__ == "__main__":
     try:
@@ -241,25 +664,16 @@ if __name__ == "__main__":
         file_handler.setLevel(logging.INFO)
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(formatter)
-        
-        # Configurer un handler pour logger sur la console
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(formatter)
-        
-        # Ajouter les handlers au logger de Flask
-        app.logger.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)
-        app.logger.addHandler(console_handler)
+        logging.getLogger().addHandler(file_handler)
         
         # Log de démarrage
-        app.logger.info("Démarrage du serveur Flask sur 0.0.0.0:8099")
+        logger.info("Démarrage du serveur web sur 0.0.0.0:8099")
         
-        # Démarrer le serveur avec les options adaptées pour un conteneur
-        app.run(host='0.0.0.0', port=8099, debug=False, use_reloader=False, threaded=True)
+        # Pas de journal d'accès: chaque image servie n'a pas à être loguée
+        web.run_app(create_app(), host='0.0.0.0', port=8099, access_log=None, print=None)
     except Exception as e:
         # Loguer les erreurs critiques
-        print(f"ERREUR CRITIQUE DANS LE SERVEUR FLASK: {str(e)}", file=sys.stderr)
+        print(f"ERREUR CRITIQUE DANS LE SERVEUR WEB: {str(e)}", file=sys.stderr)
         with open(web_log_file, "a") as f:
             f.write(f"ERREUR CRITIQUE: {str(e)}\n")
-        raise
\ No newline at end of file
+        raise